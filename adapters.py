@@ -1,41 +1,66 @@
 import logging
 from abc import ABC, abstractmethod
 
+from anomaly import AnomalyDetector
 from hardware import BME280, TSL2561, YL83
 from resources.errors import AdapterException
 from resources.utils import average
 
 
 class AbstractAdapter(ABC):
+    NAME = None
+    HANDLER = None
+    METRICS = ()
+
     def __init__(self):
-        self.data_buffer = dict()
+        self.data_buffer = {metric: list() for metric in self.METRICS}
+        self.detector = AnomalyDetector(metrics=self.METRICS)
+        self.anomalies = set()
 
     @abstractmethod
     def initialize(self, *args, **kwargs):
         ...
 
     @abstractmethod
+    def sample(self):
+        ...
+
     def read_data(self, *args, **kwargs):
+        for metric, value in zip(self.METRICS, self.sample()):
+            self.store(metric=metric, value=value)
+
+    def close(self):
         ...
 
-    def get_data(self):
-        ret = dict().fromkeys(self.data_buffer)
+    def store(self, metric, value):
+        tags = self.detector.check(metric=metric, value=value)
+        if tags:
+            self.anomalies.update(f"{metric}:{tag}" for tag in tags)
+        else:
+            self.data_buffer.get(metric).append(value)
+
+    def get_data(self, reading):
         for key, value in self.data_buffer.items():
-            ret.update({key: average(list_=value)})
+            setattr(reading, key, average(list_=value) if value else None)
+            value.clear()
 
-        return ret
+        self.detector.end_cycle()
+        if self.anomalies:
+            reading.anomalies += tuple(sorted(self.anomalies))
+            self.anomalies.clear()
 
 
 class BME280Adapter(AbstractAdapter):
+    NAME = "BME280"
+    HANDLER = "bme280"
+    METRICS = ("temperature", "pressure", "humidity")
+
     def __init__(self):
         self._log = logging.getLogger("BME280_adapter")
         self._log.info("Initializing BME280Adapter...")
 
         super().__init__()
         self.bme280 = None
-        self.data_buffer.update(
-            temperature=list(), pressure=list(), humidity=list()
-        )
 
         self._log.info("BME280Adapter initialized...")
 
@@ -56,7 +81,7 @@ class BME280Adapter(AbstractAdapter):
 
         self._log.info("Initialization successfull")
 
-    def read_data(self, *args, **kwargs):
+    def sample(self):
         temperature = self.bme280.read_temperature()
         pressure = self.bme280.read_pressure()
         humidity = self.bme280.read_humidity()
@@ -65,19 +90,20 @@ class BME280Adapter(AbstractAdapter):
         self._log.debug(f"Pressure: {pressure}")
         self._log.debug(f"Humidity: {humidity}")
 
-        self.data_buffer.get("temperature").append(temperature)
-        self.data_buffer.get("pressure").append(pressure)
-        self.data_buffer.get("humidity").append(humidity)
+        return temperature, pressure, humidity
 
 
 class TSL2561Adapter(AbstractAdapter):
+    NAME = "TSL2561"
+    HANDLER = "tsl2561"
+    METRICS = ("light_intensity",)
+
     def __init__(self):
         self._log = logging.getLogger("TSL2561_adapter")
         self._log.info("Initializing TSL2561Adapter...")
 
         super().__init__()
         self.tsl2561 = None
-        self.data_buffer.update(light_intensity=list())
 
         self._log.info("TSL2561Adapter initialized...")
 
@@ -98,22 +124,25 @@ class TSL2561Adapter(AbstractAdapter):
 
         self._log.info("Initialization successfull")
 
-    def read_data(self, *args, **kwargs):
+    def sample(self):
         light_intensity = self.tsl2561.read_full_spectrum()
 
         self._log.debug(f"Light intensity: {light_intensity}")
 
-        self.data_buffer.get("light_intensity").append(light_intensity)
+        return (light_intensity,)
 
 
 class YL83Adapter(AbstractAdapter):
+    NAME = "YL83"
+    HANDLER = "yl83"
+    METRICS = ("precipitation",)
+
     def __init__(self):
         self._log = logging.getLogger("YL83_adapter")
         self._log.info("Initializing YL83Adapter...")
 
         super().__init__()
         self.yl83 = None
-        self.data_buffer.update(precipitation=list())
 
         self._log.info("YL83Adapter initialized...")
 
@@ -134,9 +163,9 @@ class YL83Adapter(AbstractAdapter):
 
         self._log.info("Initialization successfull")
 
-    def read_data(self, *args, **kwargs):
+    def sample(self):
         precipitation = self.yl83.read_precipitation()
 
         self._log.debug(f"Precipitation: {precipitation}")
 
-        self.data_buffer.get("precipitation").append(int(precipitation))
+        return (int(precipitation),)
@@ -0,0 +1,235 @@
+"""Module containing streaming anomaly detection run on every sample read by
+adapters. State kept per metric is constant in size, so detection can run at
+full sampling rate.
+
+Each sample is checked against:
+    * Physical bounds of the sensor.
+    * EWMA z-score of the metric.
+    * Maximal step from the last valid sample of one cycle.
+    * Number of identical consecutive samples (stuck sensor).
+"""
+
+import math
+import logging
+
+from resources.errors import AnomalyException
+
+LIMITS = {
+    "temperature": {
+        "bounds": (-40, 85),
+        "z_limit": 4,
+        "min_std": .5,
+        "max_step": 2,
+        "stuck_limit": 30,
+    },
+    "pressure": {
+        "bounds": (300, 1100),
+        "z_limit": 4,
+        "min_std": 1,
+        "max_step": 5,
+        "stuck_limit": 30,
+    },
+    "humidity": {
+        "bounds": (0, 100),
+        "z_limit": 4,
+        "min_std": 2,
+        "max_step": 10,
+        "stuck_limit": 30,
+        "stuck_exempt": (100,),
+    },
+    "light_intensity": {
+        "bounds": (0, 65535),
+        "z_limit": 4,
+        "min_std": 50,
+        "stuck_limit": 30,
+        "stuck_exempt": (0, 65535),
+    },
+    "precipitation": {
+        "bounds": (0, 1),
+    },
+}
+
+RAIN_MIN_HUMIDITY = 60
+
+
+class MetricMonitor:
+    """Class holding detection state of single metric.
+
+    **Attributes**
+        :bounds: Minimal and maximal valid value. [tuple]
+        :alpha: EWMA smoothing factor. [float]
+        :z_limit: Maximal z-score of valid sample or None to disable. [float]
+        :min_std: Lower limit of standard deviation used in z-score. [float]
+        :warmup: Samples needed before z-score is checked. [int]
+        :max_step: Maximal change from the last valid sample of one cycle or
+        None to disable. [float]
+        :stuck_limit: Number of identical consecutive samples after which
+        sensor is considered stuck or None to disable. [int]
+        :stuck_exempt: Values allowed to repeat forever. [tuple]
+    """
+
+    __slots__ = (
+        "bounds", "alpha", "z_limit", "min_std", "warmup", "max_step",
+        "stuck_limit", "stuck_exempt", "_count", "_mean", "_var", "_last",
+        "_repeated", "_previous",
+    )
+
+    def __init__(
+        self, bounds=None, alpha=.05, z_limit=None, min_std=0, warmup=30,
+        max_step=None, stuck_limit=None, stuck_exempt=()
+    ):
+        """Constructor for 'MetricMonitor' class.
+
+        **Kwargs**
+            :bounds: Minimal and maximal valid value. [tuple]
+            :alpha: EWMA smoothing factor. [float]
+            :z_limit: Maximal z-score of valid sample or None to disable.
+            [float]
+            :min_std: Lower limit of standard deviation used in z-score.
+            [float]
+            :warmup: Samples needed before z-score is checked. [int]
+            :max_step: Maximal change from the last valid sample of one
+            cycle or None to disable. [float]
+            :stuck_limit: Number of identical consecutive samples after which
+            sensor is considered stuck or None to disable. [int]
+            :stuck_exempt: Values allowed to repeat forever. [tuple]
+        """
+
+        if not 0 < alpha <= 1:
+            raise AnomalyException(
+                msg="Alpha should be between 0 and 1", desc=f"It is {alpha}"
+            )
+
+        self.bounds = bounds
+        self.alpha = alpha
+        self.z_limit = z_limit
+        self.min_std = min_std
+        self.warmup = warmup
+        self.max_step = max_step
+        self.stuck_limit = stuck_limit
+        self.stuck_exempt = stuck_exempt
+        self._count = 0
+        self._mean = 0.
+        self._var = 0.
+        self._last = None
+        self._repeated = 0
+        self._previous = None
+
+    def check(self, value):
+        """Checks sample and updates state.
+
+        **Args**
+            :value: Sample value. [float/int]
+
+        **Returns**
+            Tuple of anomaly tags, empty if sample is valid.
+        """
+
+        tags = ()
+
+        if value == self._previous and value not in self.stuck_exempt:
+            self._repeated += 1
+        else:
+            self._repeated = 0
+        self._previous = value
+        if self.stuck_limit is not None and self._repeated >= self.stuck_limit:
+            tags += ("stuck",)
+
+        if self.bounds is not None and not (
+            self.bounds[0] <= value <= self.bounds[1]
+        ):
+            return tags + ("out_of_range",)
+
+        if (
+            self.max_step is not None and self._last is not None
+            and abs(value - self._last) > self.max_step
+        ):
+            tags += ("rate",)
+
+        if self.z_limit is not None and self._count >= self.warmup:
+            std = max(math.sqrt(self._var), self.min_std)
+            if abs(value - self._mean) / std > self.z_limit:
+                tags += ("z_score",)
+
+        if self._count:
+            diff = value - self._mean
+            increment = self.alpha * diff
+            self._mean += increment
+            self._var = (1 - self.alpha) * (self._var + diff * increment)
+        else:
+            self._mean = value
+        self._count += 1
+
+        if not tags:
+            self._last = value
+
+        return tags
+
+    def end_cycle(self):
+        """Forgets last sample, so step is not checked across cycles."""
+
+        self._last = None
+
+
+class AnomalyDetector:
+    """Class checking samples of all metrics of one adapter.
+
+    **Attributes**
+        :monitors: Monitors of metrics. [dict]
+    """
+
+    def __init__(self, metrics):
+        """Constructor for 'AnomalyDetector' class.
+
+        **Args**
+            :metrics: Names of checked metrics. [tuple]
+        """
+
+        self._log = logging.getLogger("anomaly_detector")
+        self.monitors = dict()
+        for metric in metrics:
+            self.monitors[metric] = MetricMonitor(**LIMITS.get(metric, {}))
+
+    def check(self, metric, value):
+        """Checks sample of metric.
+
+        **Args**
+            :metric: Name of metric. [str]
+            :value: Sample value. [float/int]
+
+        **Returns**
+            Tuple of anomaly tags, empty if sample is valid.
+        """
+
+        tags = self.monitors[metric].check(value)
+        if tags:
+            self._log.debug(f"Anomalous {metric} sample {value}: {tags}")
+
+        return tags
+
+    def end_cycle(self):
+        """Marks end of measurement cycle."""
+
+        for monitor in self.monitors.values():
+            monitor.end_cycle()
+
+
+def check_consistency(reading):
+    """Checks if metrics of different sensors agree with each other.
+
+    **Args**
+        :reading: Record of one cycle. [reading.Reading]
+
+    **Returns**
+        Tuple of anomaly tags, empty if reading is consistent.
+    """
+
+    tags = ()
+    if (
+        reading.precipitation is not None and reading.humidity is not None
+        and reading.precipitation > .5
+        and reading.humidity < RAIN_MIN_HUMIDITY
+    ):
+        tags += ("precipitation:humidity_too_low",)
+
+    return tags
@@ -0,0 +1,305 @@
+"""Module containing time-series codecs used by cold storage tier. Written
+based on Facebook's Gorilla `paper
+<https://www.vldb.org/pvldb/vol8/p1816-teller.pdf>`_.
+
+Codecs:
+    * Timestamps - delta-of-delta of milliseconds.
+    * Floats - XOR of consecutive values.
+    * Runs - run-length encoding of rarely changing values.
+"""
+
+import math
+import json
+import struct
+
+from resources.errors import CompressionException
+
+DELTA_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+    (0b11110, 5, 32),
+)
+
+
+class BitWriter:
+    """Class writing values of arbitrary bit width to bytes."""
+
+    def __init__(self):
+        """Constructor for 'BitWriter' class."""
+
+        self._buffer = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, bits):
+        """Writes lowest bits of value.
+
+        **Args**
+            :value: Value to write. [int]
+            :bits: Number of bits to write. [int]
+        """
+
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+        while self._bits >= 8:
+            self._bits -= 8
+            self._buffer.append(self._acc >> self._bits)
+            self._acc &= (1 << self._bits) - 1
+
+    def getvalue(self):
+        """Gets written bytes, last byte is padded with zeros.
+
+        **Returns**
+            Written bytes.
+        """
+
+        if self._bits:
+            return bytes(self._buffer) + bytes(
+                ((self._acc << (8 - self._bits)) & 0xFF,)
+            )
+
+        return bytes(self._buffer)
+
+
+class BitReader:
+    """Class reading values of arbitrary bit width from bytes."""
+
+    def __init__(self, data):
+        """Constructor for 'BitReader' class.
+
+        **Args**
+            :data: Bytes to read. [bytes]
+        """
+
+        self._data = data
+        self._position = 0
+        self._acc = 0
+        self._bits = 0
+
+    def read(self, bits):
+        """Reads value.
+
+        **Args**
+            :bits: Number of bits to read. [int]
+
+        **Returns**
+            Read value.
+        """
+
+        while self._bits < bits:
+            if self._position >= len(self._data):
+                raise CompressionException(
+                    msg="Unexpected end of data",
+                    desc=f"Tried to read {bits} bits"
+                )
+            self._acc = (self._acc << 8) | self._data[self._position]
+            self._position += 1
+            self._bits += 8
+
+        self._bits -= bits
+        value = self._acc >> self._bits
+        self._acc &= (1 << self._bits) - 1
+        return value
+
+
+def _signed(value, bits):
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+def encode_timestamps(timestamps):
+    """Encodes timestamps with millisecond precision as delta-of-delta.
+
+    **Args**
+        :timestamps: Unix timestamps. [list]
+
+    **Returns**
+        Encoded bytes.
+    """
+
+    writer = BitWriter()
+    previous, delta = None, 0
+    for timestamp in timestamps:
+        current = round(timestamp * 1000)
+        if previous is None:
+            writer.write(current, 64)
+        else:
+            new_delta = current - previous
+            dod = new_delta - delta
+            delta = new_delta
+            if dod == 0:
+                writer.write(0, 1)
+            else:
+                for prefix, prefix_bits, bits in DELTA_BUCKETS:
+                    if -(1 << (bits - 1)) <= dod < (1 << (bits - 1)):
+                        writer.write(prefix, prefix_bits)
+                        writer.write(dod, bits)
+                        break
+                else:
+                    writer.write(0b11111, 5)
+                    writer.write(dod, 64)
+        previous = current
+
+    return writer.getvalue()
+
+
+def decode_timestamps(data, count):
+    """Decodes timestamps encoded by 'encode_timestamps'.
+
+    **Args**
+        :data: Encoded bytes. [bytes]
+        :count: Number of encoded timestamps. [int]
+
+    **Returns**
+        List of Unix timestamps.
+    """
+
+    if not count:
+        return list()
+
+    reader = BitReader(data)
+    current = reader.read(64)
+    ret = [current / 1000]
+    delta = 0
+    for _ in range(count - 1):
+        if reader.read(1):
+            for _, prefix_bits, bits in DELTA_BUCKETS:
+                if not reader.read(1):
+                    break
+            else:
+                bits = 64
+            delta += _signed(reader.read(bits), bits)
+        current += delta
+        ret.append(current / 1000)
+
+    return ret
+
+
+def encode_floats(values, mantissa_bits=None):
+    """Encodes floats as XOR with previous value. None is stored as NaN.
+
+    **Args**
+        :values: Values to encode. [list]
+    **Kwargs**
+        :mantissa_bits: Number of kept mantissa bits or None to keep all 52.
+        Dropping bits below sensor resolution makes encoding much smaller.
+        [int]
+
+    **Returns**
+        Encoded bytes.
+    """
+
+    if mantissa_bits is not None and not 1 <= mantissa_bits <= 52:
+        raise CompressionException(
+            msg="Mantissa bits should be between 1 and 52",
+            desc=f"It is {mantissa_bits}"
+        )
+
+    mask = ~((1 << (52 - (mantissa_bits or 52))) - 1) & (2 ** 64 - 1)
+    pack = struct.Struct(">d").pack
+    writer = BitWriter()
+    previous = None
+    leading, trailing = 65, 65
+    for value in values:
+        value = math.nan if value is None else value
+        bits = int.from_bytes(pack(value), "big") & mask
+        if previous is None:
+            writer.write(bits, 64)
+            previous = bits
+            continue
+
+        xor = bits ^ previous
+        previous = bits
+        if not xor:
+            writer.write(0, 1)
+            continue
+
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if new_leading >= leading and new_trailing >= trailing:
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = new_leading, new_trailing
+            length = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(length & 0x3F, 6)
+            writer.write(xor >> trailing, length)
+
+    return writer.getvalue()
+
+
+def decode_floats(data, count):
+    """Decodes floats encoded by 'encode_floats'. NaN is decoded as None.
+
+    **Args**
+        :data: Encoded bytes. [bytes]
+        :count: Number of encoded values. [int]
+
+    **Returns**
+        List of values.
+    """
+
+    if not count:
+        return list()
+
+    unpack = struct.Struct(">d").unpack
+    reader = BitReader(data)
+    bits = reader.read(64)
+    ret = [unpack(bits.to_bytes(8, "big"))[0]]
+    leading, trailing = 0, 0
+    for _ in range(count - 1):
+        if reader.read(1):
+            if reader.read(1):
+                leading = reader.read(5)
+                length = reader.read(6) or 64
+                trailing = 64 - leading - length
+            bits ^= reader.read(64 - leading - trailing) << trailing
+        ret.append(unpack(bits.to_bytes(8, "big"))[0])
+
+    return [None if math.isnan(value) else value for value in ret]
+
+
+def encode_runs(values):
+    """Encodes values as list of runs of identical values.
+
+    **Args**
+        :values: JSON serializable values to encode. [list]
+
+    **Returns**
+        Encoded bytes.
+    """
+
+    runs = list()
+    for value in values:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+
+    return json.dumps(runs, separators=(",", ":")).encode()
+
+
+def decode_runs(data, count):
+    """Decodes values encoded by 'encode_runs'.
+
+    **Args**
+        :data: Encoded bytes. [bytes]
+        :count: Number of encoded values. [int]
+
+    **Returns**
+        List of values.
+    """
+
+    ret = list()
+    for value, length in json.loads(data):
+        ret.extend([value] * length)
+
+    if len(ret) != count:
+        raise CompressionException(
+            msg="Invalid number of decoded values",
+            desc=f"Expected {count}, got {len(ret)}"
+        )
+
+    return ret
@@ -1,11 +1,13 @@
 """Module containing 'Reader' class used to read data from all periferal
-devices and store them in dictionary.
+devices and store them in 'Reading' record.
 """
 
 import time
 import logging
-from copy import deepcopy
 
+from reading import Reading
+from anomaly import check_consistency
+from workers import IsolatedAdapter
 from factories import ReaderFactory
 from resources.errors import ReaderException
 
@@ -16,25 +18,53 @@ class Reader:
     **Attributes**
         :reader_factory: Devices readers factory. [factories.ReaderFactory]
         :readers: List of devices readers. [list]
-        :data: Dictionary of read values. [dict]
+        :data: Record of read values reused across cycles. [reading.Reading]
+        :isolated: Run every reader in its own worker process. [bool]
+        :profiler: Profiler of measurement cycles or None. [profiling.Profiler]
     """
 
-    def __init__(self):
-        """Constructor for 'Reader' class."""
+    def __init__(self, isolated=False):
+        """Constructor for 'Reader' class.
+
+        **Kwargs**
+            :isolated: Run every reader in its own worker process. [bool]
+        """
 
         self._log = logging.getLogger("reader")
         self._log.info("Initializing reader...")
 
         self.reader_factory = ReaderFactory()
         self.readers = list()
-        self.data = dict()
+        self.data = Reading()
+        self.isolated = isolated
+        self.profiler = None
 
         self._log.info("Reader initialized")
 
+    @property
+    def topics(self):
+        """Getter for topics of read metrics.
+
+        **Returns**
+            Dictionary of metrics and their '<sensor>/<metric>' topics.
+        """
+
+        return {
+            metric: f"{reader.NAME}/{metric}"
+            for reader in self.readers for metric in reader.METRICS
+        }
+
     def get_readers(self):
         """Gets all readers objects."""
 
-        self.readers = self.reader_factory.get_all_readers()
+        if self.isolated:
+            self.readers = [
+                IsolatedAdapter(adapter_class=adapter_class)
+                for adapter_class
+                in self.reader_factory.get_all_reader_classes()
+            ]
+        else:
+            self.readers = self.reader_factory.get_all_readers()
         self._log.info("Got readers")
 
     def initialize_readers(self):
@@ -45,6 +75,14 @@ class Reader:
 
         self._log.info("Initialized readers")
 
+    def close_readers(self):
+        """Closes readers objects."""
+
+        for reader in self.readers:
+            reader.close()
+
+        self._log.info("Closed readers")
+
     def get_data(self, repetitions=10, delay=.3):
         """Starts reading data process.
 
@@ -52,6 +90,9 @@ class Reader:
             :repetitions: How many times measurements should be done before
             calculating their average. [int]
             :delay: Delay before repetitions. [float]
+
+        **Returns**
+            Immutable snapshot of read values. [reading.ReadingSnapshot]
         """
 
         if not isinstance(repetitions, int):
@@ -66,13 +107,52 @@ class Reader:
                 desc=f"They are {type(delay)}"
             )
 
+        profiler = self.profiler
+        if profiler is not None and profiler.poll():
+            with profiler.cycle() as timings:
+                self._read(
+                    repetitions=repetitions, delay=delay, timings=timings
+                )
+        else:
+            self._read(repetitions=repetitions, delay=delay)
+
+        self.data.anomalies += check_consistency(reading=self.data)
+        self.data.timestamp = time.time()
+        ret = self.data.snapshot()
+        self._log.info(f"Got data: {ret}")
+
+        return ret
+
+    def _read(self, repetitions, delay, timings=None):
+        """Reads all readers into data record.
+
+        **Args**
+            :repetitions: How many times measurements should be done. [int]
+            :delay: Delay before repetitions. [float]
+        **Kwargs**
+            :timings: Dictionary collecting time spent on every reader's bus
+            or None to skip timing. [dict]
+        """
+
+        self.data.reset()
+        if self.isolated:
+            # Workers sample in parallel, every 'read_data' collects all
+            # samples of its worker.
+            for reader in self.readers:
+                reader.request(repetitions=repetitions, delay=delay)
+            repetitions, delay = 1, 0
+
         for reader in self.readers:
             for _ in range(repetitions):
-                reader.read_data()
+                if timings is None:
+                    reader.read_data()
+                else:
+                    start = time.perf_counter()
+                    reader.read_data()
+                    timings[reader.NAME] = (
+                        timings.get(reader.NAME, 0)
+                        + time.perf_counter() - start
+                    )
                 time.sleep(delay)
 
-            self.data.update(reader.get_data())
-
-        self._log.info(f"Got data: {self.data}")
-
-        return deepcopy(self.data)
+            reader.get_data(reading=self.data)
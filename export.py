@@ -0,0 +1,257 @@
+# !/usr/bin/env python
+"""Module used to export measurement history to columnar files. Data is
+streamed from the measurement store in chunks of fixed size, so memory use
+does not depend on length of exported history.
+
+Supported formats are CSV, Parquet and Arrow IPC. The last two require
+pyarrow `library <https://pypi.org/project/pyarrow/>`_.
+
+Usage::
+
+    python export.py history.parquet \\
+        --start 2019-01-01 --end 2020-01-01 --metrics temperature,pressure
+"""
+
+import os
+import csv
+import logging
+import argparse
+from datetime import datetime
+
+from reading import METRICS
+from storage import MeasurementStore, AGGREGATES
+from resources import DB_PATH
+from resources.errors import ExportException
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+ARROW_TYPES = {
+    "REAL": "float64",
+    "INTEGER": "int64",
+    "TEXT": "string",
+}
+
+
+class CSVWriter:
+    """Class writing chunks of rows to CSV file."""
+
+    def __init__(self, path, columns):
+        """Constructor for 'CSVWriter' class.
+
+        **Args**
+            :path: Path to output file. [str]
+            :columns: Dictionary of column names and their SQL types. [dict]
+        """
+
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        """Writes chunk of rows.
+
+        **Args**
+            :rows: Rows to write. [list]
+        """
+
+        self._writer.writerows(rows)
+
+    def close(self):
+        """Closes output file."""
+
+        self._file.close()
+
+
+class ArrowWriter:
+    """Class writing chunks of rows as record batches to Parquet or Arrow IPC
+    file. Every chunk becomes separate row group or record batch.
+    """
+
+    def __init__(self, path, columns, parquet=True):
+        """Constructor for 'ArrowWriter' class.
+
+        **Args**
+            :path: Path to output file. [str]
+            :columns: Dictionary of column names and their SQL types. [dict]
+        **Kwargs**
+            :parquet: Write Parquet file if True or Arrow IPC file if False.
+            [bool]
+        """
+
+        if pyarrow is None:
+            raise ExportException(
+                msg="Pyarrow is not installed",
+                desc="It is required by Parquet and Arrow formats"
+            )
+
+        unknown = {
+            column: sql_type for column, sql_type in columns.items()
+            if sql_type not in ARROW_TYPES
+        }
+        if unknown:
+            raise ExportException(
+                msg="Unsupported SQL types",
+                desc=f"Columns {unknown} have no Arrow type"
+            )
+
+        self._schema = pyarrow.schema(
+            (column, ARROW_TYPES.get(sql_type))
+            for column, sql_type in columns.items()
+        )
+        if parquet:
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(path, self._schema)
+
+    def write(self, rows):
+        """Writes chunk of rows.
+
+        **Args**
+            :rows: Rows to write. [list]
+        """
+
+        batch = pyarrow.RecordBatch.from_arrays(
+            [
+                pyarrow.array(values, type=field.type)
+                for values, field in zip(zip(*rows), self._schema)
+            ],
+            schema=self._schema
+        )
+        self._writer.write_batch(batch)
+
+    def close(self):
+        """Finishes and closes output file."""
+
+        self._writer.close()
+
+
+WRITERS = {
+    "csv": CSVWriter,
+    "parquet": lambda path, columns: ArrowWriter(path, columns),
+    "arrow": lambda path, columns: ArrowWriter(path, columns, parquet=False),
+}
+EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+
+def export(
+    store, path, format_=None, table="measurements", start=None, end=None,
+    metrics=None, chunk_size=10_000
+):
+    """Exports table of measurement store to file.
+
+    **Args**
+        :store: Store to export from. [storage.MeasurementStore]
+        :path: Path to output file. [str]
+    **Kwargs**
+        :format_: Output format, one of 'csv', 'parquet', 'arrow', or None
+        to infer it from extension of path. [str]
+        :table: Name of exported table. [str]
+        :start: Minimal timestamp, inclusive. [float]
+        :end: Maximal timestamp, exclusive. [float]
+        :metrics: Exported metrics, all if None. Rollups are exported with
+        all aggregates of metrics. Columns not belonging to any metric, like
+        timestamp, are always exported. [tuple]
+        :chunk_size: Number of rows kept in memory at once. [int]
+
+    **Returns**
+        Number of exported rows.
+    """
+
+    if format_ is None:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in EXTENSIONS:
+            raise ExportException(
+                msg="Unknown format",
+                desc=f"Format cannot be inferred from extension {extension}"
+            )
+        format_ = EXTENSIONS.get(extension)
+
+    if format_ not in WRITERS:
+        raise ExportException(
+            msg="Invalid format", desc=f"Format {format_} is not supported"
+        )
+
+    columns = store.columns(table=table)
+    if metrics is not None:
+        column_metrics = {column: _metric(column) for column in columns}
+        unknown = set(metrics) - set(column_metrics.values())
+        if unknown:
+            raise ExportException(
+                msg="Invalid metrics",
+                desc=f"Metrics {unknown} do not exist in {table}"
+            )
+        columns = {
+            column: sql_type for column, sql_type in columns.items()
+            if column_metrics.get(column) in (None, *metrics)
+        }
+
+    log = logging.getLogger("export")
+    log.info(f"Exporting {table} to {path}...")
+
+    count = 0
+    writer = WRITERS.get(format_)(path, columns)
+    try:
+        for rows in store.iter_chunks(
+            table=table, columns=tuple(columns), start=start, end=end,
+            chunk_size=chunk_size
+        ):
+            writer.write(rows=rows)
+            count += len(rows)
+    finally:
+        writer.close()
+
+    log.info(f"Exported {count} rows")
+    return count
+
+
+def _metric(column):
+    if column in METRICS:
+        return column
+
+    metric, _, aggregate = column.rpartition("_")
+    if metric in METRICS and aggregate in AGGREGATES:
+        return metric
+
+    return None
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exports measurement history."
+    )
+    parser.add_argument("path", help="Path to output file")
+    parser.add_argument(
+        "--format", choices=WRITERS, help="Inferred from extension if omitted"
+    )
+    parser.add_argument("--db", default=DB_PATH, help="Path to database")
+    parser.add_argument("--table", default="measurements")
+    parser.add_argument("--start", type=_timestamp, help="ISO date")
+    parser.add_argument("--end", type=_timestamp, help="ISO date")
+    parser.add_argument(
+        "--metrics", type=lambda value: tuple(value.split(",")),
+        help="Comma separated metrics"
+    )
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with MeasurementStore(path=args.db) as store:
+        export(
+            store=store, path=args.path, format_=args.format,
+            table=args.table, start=args.start, end=args.end,
+            metrics=args.metrics, chunk_size=args.chunk_size
+        )
@@ -35,3 +35,6 @@ class ReaderFactory:
 
     def get_all_readers(self):
         return [reader() for _, reader in self._readers.items()]
+
+    def get_all_reader_classes(self):
+        return list(self._readers.values())
@@ -62,9 +62,9 @@ class BME280:
         self._log.info("Initializing BME280 Board handler...")
 
         self._bus = smbus2.SMBus(i2c_id)
-        self._calibration_params = bme280_lib.load_calibration_params(
-            self._bus, self.ADDRESS
-        )
+        self._calibration_params = None
+        self._calibration_params_copy = None
+        self._load_calibration_params()
         self._log.info("BME280 Board handler initialized")
 
     @property
@@ -72,10 +72,10 @@ class BME280:
         """Getter for calibration parameters.
 
         **Returns**
-            Deep copy of calibration parameters.
+            Deep copy of calibration parameters, made once per load.
         """
 
-        ret = deepcopy(self._calibration_params)
+        ret = self._calibration_params_copy
         self._log.debug(f"Got calibration parameters {ret}")
         return ret
 
@@ -96,10 +96,16 @@ class BME280:
         """Reloads calibration parameters."""
 
         self._log.debug("Reloading calibration parameters...")
+        self._load_calibration_params()
+        self._log.debug("Calibration parameters reloaded")
+
+    def _load_calibration_params(self):
+        """Loads calibration parameters and their copy for callers."""
+
         self._calibration_params = bme280_lib.load_calibration_params(
             self._bus, self.ADDRESS
         )
-        self._log.debug("Calibration parameters reloaded")
+        self._calibration_params_copy = deepcopy(self._calibration_params)
 
     def read_temperature(self):
         """Reads temperature.
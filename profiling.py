@@ -0,0 +1,145 @@
+"""Module containing 'Profiler' class used to profile next measurement cycles
+on demand. Profiling is requested with a signal or by creating control file,
+optionally holding number of cycles to profile, '0' cancels profiling. Until
+requested it costs one file check per cycle.
+
+For every profiled cycle three files are written:
+    * '<name>.prof' - cProfile stats, readable by 'pstats'.
+    * '<name>.tracemalloc' - tracemalloc snapshot.
+    * '<name>.json' - cycle duration and per-sensor bus timing breakdown.
+"""
+
+import os
+import json
+import time
+import signal
+import logging
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+from resources import PROFILES_PATH, PROFILE_CONTROL_PATH
+from resources.errors import ProfilerException
+
+
+class Profiler:
+    """Class profiling measurement cycles on demand.
+
+    To use it properly::
+
+        profiler = Profiler()
+        profiler.install()
+        reader.profiler = profiler
+
+    Then profile next cycles with ``kill -USR1 <pid>`` or
+    ``echo 5 > wf_profile``.
+
+    **Attributes**
+        :directory: Directory for profiles. [str]
+        :cycles: Default number of profiled cycles. [int]
+        :control_path: Path to control file or None. [str]
+    """
+
+    def __init__(
+        self, directory=PROFILES_PATH, cycles=3,
+        control_path=PROFILE_CONTROL_PATH
+    ):
+        """Constructor for 'Profiler' class.
+
+        **Kwargs**
+            :directory: Directory for profiles. [str]
+            :cycles: Default number of profiled cycles. [int]
+            :control_path: Path to control file or None. [str]
+        """
+
+        if not isinstance(cycles, int) or cycles < 1:
+            raise ProfilerException(
+                msg="Cycles is not positive int",
+                desc=f"It is {cycles} of type {type(cycles)}"
+            )
+
+        self._log = logging.getLogger("profiler")
+        self.directory = directory
+        self.cycles = cycles
+        self.control_path = control_path
+        self._remaining = 0
+
+    def install(self, signal_number=signal.SIGUSR1):
+        """Installs signal handler requesting profiling.
+
+        **Kwargs**
+            :signal_number: Number of handled signal. [int]
+        """
+
+        signal.signal(signal_number, lambda *args: self.request())
+        self._log.info(f"Profiling on signal {signal_number}")
+
+    def request(self, cycles=None):
+        """Requests profiling of next cycles.
+
+        **Kwargs**
+            :cycles: Number of profiled cycles, default if None, 0 cancels
+            profiling. [int]
+        """
+
+        self._remaining = self.cycles if cycles is None else cycles
+
+    def poll(self):
+        """Checks if current cycle should be profiled. Consumes control file
+        if it exists.
+
+        **Returns**
+            True if cycle should be profiled.
+        """
+
+        if self.control_path is not None and os.path.exists(
+            self.control_path
+        ):
+            with open(self.control_path) as file_:
+                content = file_.read().strip()
+            os.remove(self.control_path)
+            self.request(cycles=int(content) if content.isdigit() else None)
+
+        return self._remaining > 0
+
+    @contextmanager
+    def cycle(self):
+        """Profiles one cycle.
+
+        **Yields**
+            Dictionary to be filled with bus timings in seconds.
+        """
+
+        timings = dict()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield timings
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            if not tracing:
+                tracemalloc.stop()
+            self._remaining -= 1
+            self._dump(
+                profile=profile, snapshot=snapshot, duration=duration,
+                timings=timings
+            )
+
+    def _dump(self, profile, snapshot, duration, timings):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        name = os.path.join(
+            self.directory, f"cycle_{stamp}_{self._remaining}"
+        )
+        profile.dump_stats(f"{name}.prof")
+        snapshot.dump(f"{name}.tracemalloc")
+        with open(f"{name}.json", "w") as file_:
+            json.dump({"duration": duration, "bus": timings}, file_)
+
+        self._log.info(f"Profile of cycle written to {name}.*")
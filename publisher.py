@@ -0,0 +1,363 @@
+"""Module containing classes used to fan out live readings to local consumers
+over Unix-domain socket. Every reading is encoded once and sent to all
+subscribers whose topic filter matches, so hardware is read only once no
+matter how many consumers are attached.
+
+Every frame starts with header holding frame type, topic length and payload
+length, followed by UTF-8 topic and payload. Topics have form
+'<sensor>/<metric>', subscribers filter them with shell-style patterns, e.g.
+'BME280/*' or '*/humidity'. Payload of reading frame holds timestamp and
+value as two doubles, missing value is sent as NaN.
+"""
+
+import os
+import math
+import socket
+import struct
+import logging
+import selectors
+import threading
+from fnmatch import fnmatchcase
+
+from resources import SOCKET_PATH
+from resources.errors import PublisherException
+
+FRAME = struct.Struct("!BHI")
+VALUE = struct.Struct("!dd")
+SUBSCRIBE = 1
+READING = 2
+MAX_FRAME = 1024
+MAX_PATTERNS = 64
+
+
+def encode_frame(type_, topic, payload=b""):
+    """Encodes frame.
+
+    **Args**
+        :type_: Frame type. [int]
+        :topic: Topic or topic filter. [str]
+    **Kwargs**
+        :payload: Frame payload. [bytes]
+
+    **Returns**
+        Encoded frame.
+    """
+
+    topic = topic.encode()
+    return FRAME.pack(type_, len(topic), len(payload)) + topic + payload
+
+
+class _Subscription:
+    """Connection of one subscriber."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.patterns = list()
+        self.matches = dict()
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+
+    def match(self, topic):
+        if topic not in self.matches:
+            self.matches[topic] = any(
+                fnmatchcase(topic, pattern) for pattern in self.patterns
+            )
+
+        return self.matches[topic]
+
+    def subscribe(self, pattern):
+        self.patterns.append(pattern)
+        self.matches.clear()
+
+
+class Publisher:
+    """Class publishing readings to subscribers connected to Unix socket.
+    Subscribers which do not keep up or send invalid frames are disconnected
+    instead of blocking or breaking publisher.
+
+    To use it properly::
+
+        publisher = Publisher()
+        publisher.start(topics=reader.topics)
+        publisher.publish(reading=reader.get_data())
+
+    **Attributes**
+        :path: Path to socket. [str]
+        :max_buffer: Maximal number of unsent bytes per subscriber. [int]
+    """
+
+    def __init__(self, path=SOCKET_PATH, max_buffer=64 * 1024):
+        """Constructor for 'Publisher' class.
+
+        **Kwargs**
+            :path: Path to socket. [str]
+            :max_buffer: Maximal number of unsent bytes per subscriber.
+            [int]
+        """
+
+        self._log = logging.getLogger("publisher")
+        self.path = path
+        self.max_buffer = max_buffer
+        self._topics = dict()
+        self._subscriptions = dict()
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._server = None
+        self._thread = None
+        self._running = False
+
+    def start(self, topics):
+        """Starts accepting subscribers in background thread.
+
+        **Args**
+            :topics: Dictionary of metrics and their topics. [dict]
+        """
+
+        if self._running:
+            raise PublisherException(msg="Publisher is already running")
+
+        self._topics = topics
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._serve, name="publisher", daemon=True
+        )
+        self._thread.start()
+        self._log.info(f"Publishing on {self.path}")
+
+    def publish(self, reading):
+        """Sends reading to all matching subscribers.
+
+        **Args**
+            :reading: Snapshot of reading. [reading.ReadingSnapshot]
+        """
+
+        frames = list()
+        for metric, topic in self._topics.items():
+            value = getattr(reading, metric)
+            payload = VALUE.pack(
+                reading.timestamp, math.nan if value is None else value
+            )
+            frame = encode_frame(type_=READING, topic=topic, payload=payload)
+            frames.append((topic, frame))
+
+        with self._lock:
+            for subscription in list(self._subscriptions.values()):
+                for topic, frame in frames:
+                    if subscription.match(topic=topic):
+                        subscription.outbox += frame
+
+                self._flush(subscription=subscription)
+                if len(subscription.outbox) > self.max_buffer:
+                    self._log.warning("Dropping slow subscriber")
+                    self._drop(subscription=subscription)
+
+    def close(self):
+        """Disconnects subscribers and removes socket."""
+
+        if not self._running:
+            return
+
+        self._running = False
+        self._thread.join()
+        with self._lock:
+            for subscription in list(self._subscriptions.values()):
+                self._drop(subscription=subscription)
+        self._selector.unregister(self._server)
+        self._server.close()
+        os.unlink(self.path)
+        self._log.info("Publisher closed")
+
+    def _serve(self):
+        while self._running:
+            with self._lock:
+                for subscription in self._subscriptions.values():
+                    events = selectors.EVENT_READ
+                    if subscription.outbox:
+                        events |= selectors.EVENT_WRITE
+                    self._selector.modify(subscription.connection, events)
+
+            for key, events in self._selector.select(timeout=.2):
+                with self._lock:
+                    if key.fileobj is self._server:
+                        self._accept()
+                        continue
+
+                    subscription = self._subscriptions.get(key.fileobj)
+                    if subscription is None:
+                        continue
+                    try:
+                        if events & selectors.EVENT_READ:
+                            self._receive(subscription=subscription)
+                        if events & selectors.EVENT_WRITE:
+                            self._flush(subscription=subscription)
+                    except Exception:
+                        self._log.exception("Subscriber handling failed")
+                        self._drop(subscription=subscription)
+
+    def _accept(self):
+        try:
+            connection, _ = self._server.accept()
+        except BlockingIOError:
+            return
+
+        connection.setblocking(False)
+        self._subscriptions[connection] = _Subscription(connection=connection)
+        self._selector.register(connection, selectors.EVENT_READ)
+        self._log.info("Subscriber connected")
+
+    def _receive(self, subscription):
+        try:
+            data = subscription.connection.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._drop(subscription=subscription)
+            return
+
+        inbox = subscription.inbox
+        inbox += data
+        while len(inbox) >= FRAME.size:
+            type_, topic_length, payload_length = FRAME.unpack_from(inbox)
+            size = FRAME.size + topic_length + payload_length
+            if type_ != SUBSCRIBE or size > MAX_FRAME:
+                self._reject(
+                    subscription=subscription,
+                    reason=f"invalid frame of type {type_} and size {size}"
+                )
+                return
+            if len(inbox) < size:
+                break
+
+            topic = bytes(inbox[FRAME.size:FRAME.size + topic_length])
+            del inbox[:size]
+            try:
+                pattern = topic.decode()
+            except UnicodeDecodeError:
+                self._reject(
+                    subscription=subscription, reason="invalid UTF-8 topic"
+                )
+                return
+            if len(subscription.patterns) >= MAX_PATTERNS:
+                self._reject(
+                    subscription=subscription,
+                    reason=f"over {MAX_PATTERNS} patterns"
+                )
+                return
+
+            subscription.subscribe(pattern=pattern)
+            self._log.info(f"Subscribed to {pattern}")
+
+    def _reject(self, subscription, reason):
+        self._log.warning(f"Dropping subscriber sending {reason}")
+        self._drop(subscription=subscription)
+
+    def _flush(self, subscription):
+        if not subscription.outbox:
+            return
+
+        try:
+            sent = subscription.connection.send(subscription.outbox)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(subscription=subscription)
+            return
+
+        del subscription.outbox[:sent]
+
+    def _drop(self, subscription):
+        if self._subscriptions.pop(subscription.connection, None) is None:
+            return
+
+        self._selector.unregister(subscription.connection)
+        subscription.connection.close()
+        self._log.info("Subscriber disconnected")
+
+
+class Subscriber:
+    """Class receiving readings from 'Publisher'.
+
+    To use it properly::
+
+        with Subscriber() as subscriber:
+            subscriber.subscribe("BME280/*")
+            for topic, timestamp, value in subscriber:
+                ...
+
+    **Attributes**
+        :path: Path to socket. [str]
+    """
+
+    def __init__(self, path=SOCKET_PATH):
+        """Constructor for 'Subscriber' class.
+
+        **Kwargs**
+            :path: Path to socket. [str]
+        """
+
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            message = self.receive()
+            if message is None:
+                return
+            yield message
+
+    def subscribe(self, pattern):
+        """Subscribes to topics matching pattern.
+
+        **Args**
+            :pattern: Shell-style topic pattern. [str]
+        """
+
+        self._socket.sendall(encode_frame(type_=SUBSCRIBE, topic=pattern))
+
+    def receive(self):
+        """Waits for next reading.
+
+        **Returns**
+            Tuple of topic, timestamp and value or None if publisher closed
+            connection.
+        """
+
+        while True:
+            header = self._file.read(FRAME.size)
+            if len(header) < FRAME.size:
+                return None
+
+            type_, topic_length, payload_length = FRAME.unpack(header)
+            topic = self._file.read(topic_length).decode()
+            payload = self._file.read(payload_length)
+            if type_ != READING:
+                continue
+
+            timestamp, value = VALUE.unpack(payload)
+            return topic, timestamp, None if math.isnan(value) else value
+
+    def close(self):
+        """Closes connection."""
+
+        self._file.close()
+        self._socket.close()
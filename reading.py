@@ -0,0 +1,61 @@
+"""Module containing 'Reading' record holding one measurement cycle of all
+periferal devices. Record has fixed metric schema and is reused across cycles,
+consumers get immutable 'ReadingSnapshot' of it.
+"""
+
+from operator import attrgetter
+from collections import namedtuple
+
+METRICS = (
+    "temperature",
+    "pressure",
+    "humidity",
+    "light_intensity",
+    "precipitation",
+)
+FIELDS = ("timestamp",) + METRICS + ("anomalies",)
+
+_VALUES = attrgetter(*FIELDS)
+
+ReadingSnapshot = namedtuple("ReadingSnapshot", FIELDS)
+
+
+class Reading:
+    """Mutable record of one measurement cycle. Metrics not measured in cycle
+    or with all samples flagged as anomalous are None.
+
+    **Attributes**
+        :timestamp: Unix time of the end of the cycle. [float]
+        :temperature: Temperature in Celsius. [float]
+        :pressure: Pressure in hecto Pascals. [float]
+        :humidity: Humidity in percents. [float]
+        :light_intensity: Full light spectrum value. [float]
+        :precipitation: Fraction of samples with rain falling. [float]
+        :anomalies: Tags of anomalies detected in cycle. [tuple]
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        """Constructor for 'Reading' class."""
+
+        self.reset()
+
+    def __repr__(self):
+        return repr(self.snapshot())
+
+    def reset(self):
+        """Clears all fields before next cycle."""
+
+        for field in FIELDS:
+            setattr(self, field, None)
+        self.anomalies = ()
+
+    def snapshot(self):
+        """Freezes current state of record.
+
+        **Returns**
+            Immutable snapshot of record. [reading.ReadingSnapshot]
+        """
+
+        return ReadingSnapshot._make(_VALUES(self))
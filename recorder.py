@@ -0,0 +1,309 @@
+"""Module containing classes used to record raw outputs of hardware handlers
+and to replay them back through 'Reader'.
+
+Trace is a text file with one JSON object per line::
+
+    {"time": 1571472000.12, "sensor": "BME280", "method": "read_temperature",
+     "value": 21.37}
+"""
+
+import json
+import time
+import logging
+from collections import defaultdict, deque
+
+from resources.errors import RecorderException
+
+
+def _check_handler(adapter):
+    if adapter.HANDLER is None:
+        raise RecorderException(
+            msg="Adapter has no handler",
+            desc=f"Adapter {adapter.NAME} reads its handler in worker process"
+        )
+
+
+class RecordingHandler:
+    """Proxy placed between adapter and its hardware handler. Every call of
+    handler's 'read_*' method is passed through and its result is written
+    to recorder.
+
+    **Attributes**
+        :sensor: Name of recorded sensor. [str]
+    """
+
+    def __init__(self, handler, sensor, recorder):
+        """Constructor for 'RecordingHandler' class.
+
+        **Args**
+            :handler: Hardware handler to record. [object]
+            :sensor: Name of recorded sensor. [str]
+            :recorder: Recorder writing trace. [recorder.Recorder]
+        """
+
+        self._handler = handler
+        self._recorder = recorder
+        self.sensor = sensor
+
+    def __getattr__(self, name):
+        attribute = getattr(self._handler, name)
+        if not name.startswith("read_") or not callable(attribute):
+            return attribute
+
+        def recorded(*args, **kwargs):
+            value = attribute(*args, **kwargs)
+            self._recorder.write(
+                sensor=self.sensor, method=name, value=value
+            )
+            return value
+
+        return recorded
+
+
+class Recorder:
+    """Class writing trace of handlers outputs.
+
+    To use it properly::
+
+        reader = Reader()
+        reader.get_readers()
+        reader.initialize_readers()
+        with Recorder(path="trace.jsonl") as recorder:
+            recorder.attach(reader=reader)
+            reader.get_data()
+
+    **Attributes**
+        :path: Path to trace file. [str]
+    """
+
+    def __init__(self, path):
+        """Constructor for 'Recorder' class.
+
+        **Args**
+            :path: Path to trace file, overwritten if it exists. [str]
+        """
+
+        self._log = logging.getLogger("recorder")
+        self.path = path
+        self._file = open(path, "w")
+        self._log.info(f"Recording to {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def attach(self, reader):
+        """Places recording proxies under all initialized adapters of reader.
+        Isolated adapters cannot be recorded.
+
+        **Args**
+            :reader: Reader with initialized adapters. [data_reader.Reader]
+        """
+
+        for adapter in reader.readers:
+            _check_handler(adapter=adapter)
+            handler = getattr(adapter, adapter.HANDLER)
+            if handler is None:
+                raise RecorderException(
+                    msg="Adapter is not initialized",
+                    desc=f"Adapter {adapter.NAME} has no handler"
+                )
+
+            setattr(
+                adapter,
+                adapter.HANDLER,
+                RecordingHandler(
+                    handler=handler, sensor=adapter.NAME, recorder=self
+                )
+            )
+            self._log.info(f"Attached to {adapter.NAME}")
+
+    def write(self, sensor, method, value):
+        """Writes single handler output to trace.
+
+        **Args**
+            :sensor: Name of sensor. [str]
+            :method: Name of called handler method. [str]
+            :value: Value returned by handler. [float/int/bool]
+        """
+
+        record = {
+            "time": time.time(),
+            "sensor": sensor,
+            "method": method,
+            "value": value,
+        }
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        """Flushes and closes trace file."""
+
+        if not self._file.closed:
+            self._file.close()
+            self._log.info("Recording finished")
+
+
+class ReplayHandler:
+    """Fake hardware handler returning values from trace instead of reading
+    them from device.
+
+    **Attributes**
+        :sensor: Name of replayed sensor. [str]
+    """
+
+    def __init__(self, sensor, replayer):
+        """Constructor for 'ReplayHandler' class.
+
+        **Args**
+            :sensor: Name of replayed sensor. [str]
+            :replayer: Replayer owning trace. [recorder.Replayer]
+        """
+
+        self._replayer = replayer
+        self.sensor = sensor
+
+    def __getattr__(self, name):
+        if not name.startswith("read_"):
+            raise AttributeError(name)
+
+        def replayed(*args, **kwargs):
+            return self._replayer.next_value(sensor=self.sensor, method=name)
+
+        return replayed
+
+
+class Replayer:
+    """Class feeding recorded trace back through 'Reader'.
+
+    To use it properly::
+
+        reader = Reader()
+        reader.get_readers()
+        replayer = Replayer(path="trace.jsonl")
+        replayer.attach(reader=reader)
+        for data in replayer.run(reader=reader):
+            ...
+
+    **Attributes**
+        :path: Path to trace file. [str]
+        :speed: Replay speed relative to real time or None to replay as fast
+        as possible. [float]
+    """
+
+    def __init__(self, path, speed=None):
+        """Constructor for 'Replayer' class.
+
+        **Args**
+            :path: Path to trace file. [str]
+        **Kwargs**
+            :speed: Replay speed relative to real time or None to replay as
+            fast as possible. [float]
+        """
+
+        if speed is not None and (
+            not isinstance(speed, (float, int)) or speed <= 0
+        ):
+            raise RecorderException(
+                msg="Speed is not positive number",
+                desc=f"Speed is {speed} of type {type(speed)}"
+            )
+
+        self._log = logging.getLogger("replayer")
+        self.path = path
+        self.speed = speed
+        self._traces = defaultdict(deque)
+        self._trace_origin = None
+        self._clock_origin = None
+        self._trace_time = None
+
+        with open(path) as file_:
+            for line in file_:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if self._trace_origin is None:
+                    self._trace_origin = record["time"]
+                self._traces[record["sensor"], record["method"]].append(
+                    (record["time"], record["value"])
+                )
+
+        self._log.info(f"Loaded trace {path}")
+
+    def attach(self, reader):
+        """Places replay handlers under all adapters of reader. Adapters do
+        not have to be initialized, isolated adapters cannot be replayed.
+
+        **Args**
+            :reader: Reader with adapters. [data_reader.Reader]
+        """
+
+        for adapter in reader.readers:
+            _check_handler(adapter=adapter)
+            setattr(
+                adapter,
+                adapter.HANDLER,
+                ReplayHandler(sensor=adapter.NAME, replayer=self)
+            )
+            self._log.info(f"Attached to {adapter.NAME}")
+
+    def remaining(self):
+        """Gets number of values left in the shortest replayed series.
+
+        **Returns**
+            Number of values left.
+        """
+
+        return min((len(trace) for trace in self._traces.values()), default=0)
+
+    def next_value(self, sensor, method):
+        """Gets next recorded value of handler method. In real time mode
+        waits until recorded moment comes.
+
+        **Args**
+            :sensor: Name of sensor. [str]
+            :method: Name of called handler method. [str]
+
+        **Returns**
+            Recorded value.
+        """
+
+        trace = self._traces.get((sensor, method))
+        if not trace:
+            raise RecorderException(
+                msg="Trace exhausted",
+                desc=f"No more values for {sensor}.{method}"
+            )
+
+        timestamp, value = trace.popleft()
+        self._trace_time = timestamp
+        if self.speed is not None:
+            if self._clock_origin is None:
+                self._clock_origin = time.monotonic()
+            due = (timestamp - self._trace_origin) / self.speed
+            wait = due - (time.monotonic() - self._clock_origin)
+            if wait > 0:
+                time.sleep(wait)
+
+        return value
+
+    def run(self, reader, repetitions=10):
+        """Drives reader through whole trace.
+
+        **Args**
+            :reader: Reader with attached replayer. [data_reader.Reader]
+        **Kwargs**
+            :repetitions: How many measurements are averaged in one
+            cycle. [int]
+
+        **Yields**
+            Data returned by reader for every replayed cycle, timestamped
+            with trace time of its last value.
+        """
+
+        while self.remaining() >= repetitions:
+            data = reader.get_data(repetitions=repetitions, delay=0)
+            yield data._replace(timestamp=self._trace_time)
+
+        self._log.info("Replay finished")
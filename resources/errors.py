@@ -37,3 +37,39 @@ class UtilsException(AbstractException):
 
 class ReaderException(AbstractException):
     """Exception for 'Reader' class"""
+
+
+class RecorderException(AbstractException):
+    """Exception for recording and replaying handler outputs."""
+
+
+class AnomalyException(AbstractException):
+    """Exception for anomaly detection."""
+
+
+class StorageException(AbstractException):
+    """Exception for measurement storage."""
+
+
+class ExportException(AbstractException):
+    """Exception for measurement export."""
+
+
+class CompressionException(AbstractException):
+    """Exception for time-series compression."""
+
+
+class SchedulerException(AbstractException):
+    """Exception for scheduler."""
+
+
+class WorkerException(AbstractException):
+    """Exception for isolated sensor workers."""
+
+
+class PublisherException(AbstractException):
+    """Exception for publisher of live readings."""
+
+
+class ProfilerException(AbstractException):
+    """Exception for profiler of measurement cycles."""
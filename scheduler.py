@@ -0,0 +1,155 @@
+"""Module containing 'Scheduler' class used to run periodic jobs aligned to
+wall-clock boundaries. Deadlines are kept on monotonic clock, so they do not
+drift with duration of jobs nor jump with system time changes.
+"""
+
+import math
+import time
+import logging
+import threading
+
+from resources.errors import SchedulerException
+
+
+class Job:
+    """Class describing periodic job.
+
+    **Attributes**
+        :name: Name of job. [str]
+        :function: Function called without arguments. [callable]
+        :period: Period in seconds. [float]
+        :offset: Offset from wall-clock boundary in seconds. [float]
+        :compensate: Start job earlier by its expected duration, so it ends
+        on boundary. [bool]
+        :duration: Smoothed duration of job in seconds. [float]
+        :deadline: Monotonic time of the next run. [float]
+    """
+
+    def __init__(self, name, function, period, offset=0, compensate=False):
+        """Constructor for 'Job' class.
+
+        **Args**
+            :name: Name of job. [str]
+            :function: Function called without arguments. [callable]
+            :period: Period in seconds. [float]
+        **Kwargs**
+            :offset: Offset from wall-clock boundary in seconds. [float]
+            :compensate: Start job earlier by its expected duration, so it
+            ends on boundary. [bool]
+        """
+
+        if not isinstance(period, (float, int)) or period <= 0:
+            raise SchedulerException(
+                msg="Period is not positive number",
+                desc=f"Period is {period} of type {type(period)}"
+            )
+
+        self.name = name
+        self.function = function
+        self.period = period
+        self.offset = offset
+        self.compensate = compensate
+        self.duration = 0.
+        self.deadline = None
+        self._boundary = None
+
+    def schedule(self, wall, monotonic):
+        """Sets deadline to the next wall-clock boundary.
+
+        **Args**
+            :wall: Current wall-clock time. [float]
+            :monotonic: Current monotonic time. [float]
+        """
+
+        lead = self.duration if self.compensate else 0
+        boundary = (
+            math.floor((wall + lead - self.offset) / self.period) + 1
+        ) * self.period + self.offset
+        if self._boundary is not None and boundary <= self._boundary:
+            boundary = self._boundary + self.period
+
+        self._boundary = boundary
+        self.deadline = monotonic + (boundary - wall) - lead
+
+    def run(self):
+        """Runs job and updates its smoothed duration."""
+
+        start = time.monotonic()
+        self.function()
+        duration = time.monotonic() - start
+        if self.duration:
+            self.duration += .2 * (duration - self.duration)
+        else:
+            self.duration = duration
+
+
+class Scheduler:
+    """Class running periodic jobs until stopped.
+
+    To use it properly::
+
+        scheduler = Scheduler()
+        scheduler.add_job(name="sampling", function=sample, period=3600)
+        scheduler.run()
+
+    **Attributes**
+        :jobs: List of scheduled jobs. [list]
+    """
+
+    def __init__(self):
+        """Constructor for 'Scheduler' class."""
+
+        self._log = logging.getLogger("scheduler")
+        self._stop = threading.Event()
+        self.jobs = list()
+
+    def add_job(self, name, function, period, offset=0, compensate=False):
+        """Adds periodic job.
+
+        **Args**
+            :name: Name of job. [str]
+            :function: Function called without arguments. [callable]
+            :period: Period in seconds. [float]
+        **Kwargs**
+            :offset: Offset from wall-clock boundary in seconds. [float]
+            :compensate: Start job earlier by its expected duration, so it
+            ends on boundary. [bool]
+        """
+
+        job = Job(
+            name=name, function=function, period=period, offset=offset,
+            compensate=compensate
+        )
+        job.schedule(wall=time.time(), monotonic=time.monotonic())
+        self.jobs.append(job)
+        self._log.info(f"Added job {name} every {period} s")
+
+    def run(self):
+        """Runs jobs until 'stop' is called. Runs missed because of long
+        jobs are skipped, not repeated.
+        """
+
+        if not self.jobs:
+            raise SchedulerException(msg="No jobs to run")
+
+        self._log.info("Scheduler started")
+        while not self._stop.is_set():
+            job = min(self.jobs, key=lambda job_: job_.deadline)
+            if self._stop.wait(max(job.deadline - time.monotonic(), 0)):
+                break
+
+            lateness = time.monotonic() - job.deadline
+            self._log.debug(f"Running job {job.name} late by {lateness} s")
+            try:
+                job.run()
+            except Exception:
+                self._log.exception(f"Job {job.name} failed")
+
+            job.schedule(wall=time.time(), monotonic=time.monotonic())
+
+        self._log.info("Scheduler stopped")
+
+    def stop(self):
+        """Stops scheduler after currently running job."""
+
+        self._stop.set()
@@ -0,0 +1,200 @@
+# !/usr/bin/env python
+"""Module containing 'Station' daemon, entry point of weather station. It
+reads all periferal devices on wall-clock boundaries, stores measurements,
+aggregates them into rollups, compacts old measurements and optionally
+publishes live readings to local subscribers.
+
+Usage::
+
+    python station.py --period 3600
+"""
+
+import time
+import signal
+import logging
+import argparse
+
+from scheduler import Scheduler
+from data_reader import Reader
+from storage import MeasurementStore, SENSOR_MANTISSA_BITS
+from publisher import Publisher
+from profiling import Profiler
+from resources import DB_PATH
+
+
+class Station:
+    """Class running periodic jobs of weather station.
+
+    **Attributes**
+        :reader: Reader of periferal devices. [data_reader.Reader]
+        :store: Measurements store. [storage.MeasurementStore]
+        :publisher: Publisher of live readings or None. [publisher.Publisher]
+        :profiler: Profiler of measurement cycles. [profiling.Profiler]
+        :scheduler: Scheduler of jobs. [scheduler.Scheduler]
+        :period: Sampling period in seconds. [float]
+        :rollup_period: Rollup period in seconds. [float]
+        :retention: Age in seconds after which measurements are compacted.
+        [float]
+        :mantissa_bits: Mantissa bits per metric kept by compaction or None
+        for lossless compaction. [dict]
+        :cold_resolution: Length in seconds of periods averaged by compaction
+        or None to compact every measurement. [float]
+    """
+
+    def __init__(
+        self, db_path=DB_PATH, period=3600, rollup_period=86400,
+        retention=30 * 86400, mantissa_bits=SENSOR_MANTISSA_BITS,
+        cold_resolution=60, isolated=False, publish=False
+    ):
+        """Constructor for 'Station' class.
+
+        **Kwargs**
+            :db_path: Path to database file. [str]
+            :period: Sampling period in seconds. [float]
+            :rollup_period: Rollup period in seconds. [float]
+            :retention: Age in seconds after which measurements are
+            compacted. [float]
+            :mantissa_bits: Mantissa bits per metric kept by compaction or
+            None for lossless compaction. [dict]
+            :cold_resolution: Length in seconds of periods averaged by
+            compaction or None to compact every measurement. [float]
+            :isolated: Run every sensor in its own worker process. [bool]
+            :publish: Publish live readings on Unix socket. [bool]
+        """
+
+        self._log = logging.getLogger("station")
+        self._log.info("Initializing station...")
+
+        self.reader = Reader(isolated=isolated)
+        self.store = MeasurementStore(path=db_path)
+        self.publisher = Publisher() if publish else None
+        self.profiler = Profiler()
+        self.reader.profiler = self.profiler
+        self.scheduler = Scheduler()
+        self.period = period
+        self.rollup_period = rollup_period
+        self.retention = retention
+        self.mantissa_bits = mantissa_bits
+        self.cold_resolution = cold_resolution
+
+        self._log.info("Station initialized")
+
+    def sample(self):
+        """Reads all devices and stores measurement."""
+
+        reading = self.reader.get_data()
+        self.store.insert(reading=reading)
+        if self.publisher is not None:
+            self.publisher.publish(reading=reading)
+
+    def rollup(self):
+        """Aggregates last finished rollup period."""
+
+        end = time.time() // self.rollup_period * self.rollup_period
+        self.store.rollup(
+            start=end - self.rollup_period, end=end,
+            period=self.rollup_period
+        )
+
+    def compact(self):
+        """Compacts measurements older than retention."""
+
+        self.store.compact(
+            before=time.time() - self.retention,
+            mantissa_bits=self.mantissa_bits,
+            resolution=self.cold_resolution
+        )
+
+    def run(self):
+        """Initializes devices and runs jobs until SIGINT or SIGTERM comes."""
+
+        self.reader.get_readers()
+        self.reader.initialize_readers()
+        if self.publisher is not None:
+            self.publisher.start(topics=self.reader.topics)
+
+        self.scheduler.add_job(
+            name="sampling", function=self.sample, period=self.period,
+            compensate=True
+        )
+        self.scheduler.add_job(
+            name="rollup", function=self.rollup, period=self.rollup_period,
+            offset=60
+        )
+        self.scheduler.add_job(
+            name="retention", function=self.compact, period=86400,
+            offset=120
+        )
+
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, self._handle_signal)
+        self.profiler.install()
+
+        try:
+            self.scheduler.run()
+        finally:
+            if self.publisher is not None:
+                self.publisher.close()
+            self.reader.close_readers()
+            self.store.close()
+            self._log.info("Station stopped")
+
+    def _handle_signal(self, signal_number, frame):
+        self._log.info(f"Got signal {signal_number}, stopping...")
+        self.scheduler.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs weather station.")
+    parser.add_argument("--db", default=DB_PATH, help="Path to database")
+    parser.add_argument(
+        "--period", type=float, default=3600, help="Sampling period in s"
+    )
+    parser.add_argument(
+        "--rollup-period", type=float, default=86400,
+        help="Rollup period in s"
+    )
+    parser.add_argument(
+        "--retention-days", type=float, default=30,
+        help="Days after which measurements are compacted"
+    )
+    parser.add_argument(
+        "--mantissa-bits", action="append", default=list(),
+        metavar="METRIC=BITS",
+        help="Mantissa bits kept by compaction, overrides sensor resolution"
+    )
+    parser.add_argument(
+        "--lossless", action="store_true", help="Compact losslessly"
+    )
+    parser.add_argument(
+        "--cold-resolution", type=float, default=60,
+        help="Period in s averaged by compaction, 0 keeps every measurement"
+    )
+    parser.add_argument(
+        "--isolated", action="store_true",
+        help="Run every sensor in its own worker process"
+    )
+    parser.add_argument(
+        "--publish", action="store_true",
+        help="Publish live readings on Unix socket"
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    mantissa_bits = None if args.lossless else dict(SENSOR_MANTISSA_BITS)
+    for option in args.mantissa_bits:
+        metric, _, bits = option.partition("=")
+        if (
+            mantissa_bits is None or metric not in mantissa_bits
+            or not bits.isdigit() or not 1 <= int(bits) <= 52
+        ):
+            parser.error(f"Invalid mantissa bits {option}")
+        mantissa_bits[metric] = int(bits)
+    Station(
+        db_path=args.db, period=args.period,
+        rollup_period=args.rollup_period,
+        retention=args.retention_days * 86400, mantissa_bits=mantissa_bits,
+        cold_resolution=args.cold_resolution or None, isolated=args.isolated,
+        publish=args.publish
+    ).run()
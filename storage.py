@@ -0,0 +1,424 @@
+"""Module containing 'MeasurementStore' class used to keep measurements in
+SQLite database.
+
+Recent measurements are kept as plain rows in 'measurements' table. Older ones
+can be compacted into compressed blocks of 'cold_blocks' table, which are
+transparently decoded when measurements are read. Compacted measurements can
+be downsampled to averages over fixed periods first. Aggregates of measurements
+over fixed periods are kept in 'rollups' table.
+"""
+
+import sqlite3
+import logging
+from itertools import chain, islice, groupby
+
+from reading import METRICS
+from compression import (
+    encode_timestamps, decode_timestamps, encode_floats, decode_floats,
+    encode_runs, decode_runs,
+)
+from resources import DB_PATH
+from resources.errors import StorageException
+
+SQL_TYPES = {"timestamp": "REAL"}
+SQL_TYPES.update((metric, "REAL") for metric in METRICS)
+SQL_TYPES.update(anomalies="TEXT")
+
+CODECS = {
+    "timestamp": (encode_timestamps, decode_timestamps),
+    "precipitation": (encode_runs, decode_runs),
+    "anomalies": (encode_runs, decode_runs),
+}
+FLOAT_CODEC = (encode_floats, decode_floats)
+
+# Mantissa bits keeping truncation error of float metrics below sensors
+# resolution: 0.01 degC below 64 degC, 0.0018 hPa below 1024 hPa, 0.008 %RH
+# and single count of 16-bit light channel.
+SENSOR_MANTISSA_BITS = {
+    "temperature": 12,
+    "pressure": 19,
+    "humidity": 13,
+    "light_intensity": 15,
+}
+
+AGGREGATES = ("mean", "min", "max")
+ROLLUP_TYPES = {"timestamp": "REAL", "period": "REAL", "size": "INTEGER"}
+ROLLUP_TYPES.update(
+    (f"{metric}_{aggregate}", "REAL")
+    for metric in METRICS for aggregate in AGGREGATES
+)
+ROLLUP_COLUMNS = tuple(ROLLUP_TYPES)
+
+# Metrics downsampled to maximum instead of mean, so short rain is kept.
+MAX_METRICS = ("precipitation",)
+
+
+def _downsample(rows, resolution):
+    """Averages measurements ordered by timestamp over periods of given
+    length. Anomalies of period are merged.
+
+    **Args**
+        :rows: Rows of all measurement columns. [iterable]
+        :resolution: Length of period in seconds. [float]
+
+    **Yields**
+        Rows timestamped with start of their period.
+    """
+
+    for bucket, group in groupby(
+        rows, key=lambda row: row[0] // resolution * resolution
+    ):
+        _, *series, anomalies = zip(*group)
+        row = [bucket]
+        for metric, values in zip(METRICS, series):
+            values = [value for value in values if value is not None]
+            if not values:
+                row.append(None)
+            elif metric in MAX_METRICS:
+                row.append(max(values))
+            else:
+                row.append(sum(values) / len(values))
+
+        row.append(",".join(sorted({
+            tag for tags in anomalies if tags for tag in tags.split(",")
+        })))
+        yield tuple(row)
+
+
+def _rollup_row(bucket, period, size, aggregates):
+    row = [bucket, period, size]
+    for total, count, minimum, maximum in aggregates:
+        row += [total / count if count else None, minimum, maximum]
+    return row
+
+
+class MeasurementStore:
+    """Class managing measurements database.
+
+    **Attributes**
+        :path: Path to database file. [str]
+    """
+
+    def __init__(self, path=DB_PATH):
+        """Constructor for 'MeasurementStore' class.
+
+        **Kwargs**
+            :path: Path to database file. [str]
+        """
+
+        self._log = logging.getLogger("measurement_store")
+        self._log.info(f"Opening measurement store {path}...")
+
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        columns = ", ".join(
+            f"{column} {sql_type}" for column, sql_type in SQL_TYPES.items()
+        )
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS measurements ({columns})"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS measurements_timestamp "
+            "ON measurements (timestamp)"
+        )
+        columns = ", ".join(f"{column} BLOB" for column in SQL_TYPES)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cold_blocks "
+            f"(start_time REAL, end_time REAL, size INTEGER, {columns})"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cold_blocks_start_time "
+            "ON cold_blocks (start_time)"
+        )
+        columns = ", ".join(
+            f"{column} {sql_type}"
+            for column, sql_type in ROLLUP_TYPES.items()
+        )
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS rollups ({columns})"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS rollups_timestamp "
+            "ON rollups (timestamp)"
+        )
+        self._connection.commit()
+
+        self._log.info("Measurement store opened")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def insert(self, reading):
+        """Inserts one measurement.
+
+        **Args**
+            :reading: Snapshot of measurement. [reading.ReadingSnapshot]
+        """
+
+        row = reading._replace(anomalies=",".join(reading.anomalies))
+        self._connection.execute(
+            f"INSERT INTO measurements ({', '.join(row._fields)}) "
+            f"VALUES ({', '.join('?' * len(row))})",
+            row
+        )
+        self._connection.commit()
+
+    def tables(self):
+        """Gets names of stored tables.
+
+        **Returns**
+            Tuple of table names.
+        """
+
+        cursor = self._connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+        return tuple(name for name, in cursor)
+
+    def columns(self, table):
+        """Gets columns of table.
+
+        **Args**
+            :table: Name of table. [str]
+
+        **Returns**
+            Dictionary of column names and their SQL types.
+        """
+
+        if table not in self.tables():
+            raise StorageException(
+                msg="Invalid table", desc=f"Table {table} does not exist"
+            )
+
+        cursor = self._connection.execute(f"PRAGMA table_info({table})")
+        return {row[1]: row[2] for row in cursor}
+
+    def rollup(self, start, end, period):
+        """Aggregates measurements from given time range into periods.
+        Compressed blocks are read too, so already compacted range can be
+        aggregated again.
+
+        **Args**
+            :start: Minimal timestamp, inclusive. [float]
+            :end: Maximal timestamp, exclusive. [float]
+            :period: Length of aggregated period in seconds. [float]
+
+        **Returns**
+            Number of inserted rollups.
+        """
+
+        rollups = list()
+        bucket, size, aggregates = None, 0, None
+        for chunk in self.iter_chunks(
+            columns=("timestamp",) + METRICS, start=start, end=end
+        ):
+            for timestamp, *values in chunk:
+                row_bucket = timestamp // period * period
+                if row_bucket != bucket:
+                    if bucket is not None:
+                        rollups.append(
+                            _rollup_row(bucket, period, size, aggregates)
+                        )
+                    bucket, size = row_bucket, 0
+                    aggregates = [[0., 0, None, None] for _ in METRICS]
+
+                size += 1
+                for aggregate, value in zip(aggregates, values):
+                    if value is None:
+                        continue
+                    aggregate[0] += value
+                    aggregate[1] += 1
+                    if aggregate[2] is None or value < aggregate[2]:
+                        aggregate[2] = value
+                    if aggregate[3] is None or value > aggregate[3]:
+                        aggregate[3] = value
+
+        if bucket is not None:
+            rollups.append(_rollup_row(bucket, period, size, aggregates))
+
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO rollups ({', '.join(ROLLUP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})",
+                rollups
+            )
+
+        self._log.info(f"Inserted {len(rollups)} rollups")
+        return len(rollups)
+
+    def compact(
+        self, before, block_size=3600, mantissa_bits=None, resolution=None
+    ):
+        """Moves measurements older than given time to compressed blocks.
+
+        **Args**
+            :before: Timestamp of the oldest measurement left as row. [float]
+        **Kwargs**
+            :block_size: Maximal number of measurements in block. [int]
+            :mantissa_bits: Number of kept mantissa bits of float metrics,
+            dictionary of them per metric or None for lossless compression.
+            Metrics missing from dictionary are compressed losslessly.
+            [int/dict]
+            :resolution: Length in seconds of periods over which measurements
+            are averaged before compression or None to keep all of them.
+            Precipitation keeps its maximum. [float]
+
+        **Returns**
+            Number of compacted measurements.
+        """
+
+        if resolution is not None:
+            if not isinstance(resolution, (float, int)) or resolution <= 0:
+                raise StorageException(
+                    msg="Resolution is not positive number",
+                    desc=f"It is {resolution} of type {type(resolution)}"
+                )
+            before = before // resolution * resolution
+
+        if not isinstance(mantissa_bits, dict):
+            mantissa_bits = dict.fromkeys(METRICS, mantissa_bits)
+
+        columns = tuple(SQL_TYPES)
+        with self._connection:
+            measurements = self._connection.execute(
+                f"SELECT {', '.join(columns)} FROM measurements "
+                "WHERE timestamp < ? ORDER BY timestamp",
+                (before,)
+            )
+            if resolution is not None:
+                measurements = _downsample(
+                    rows=measurements, resolution=resolution
+                )
+            while True:
+                rows = list(islice(measurements, block_size))
+                if not rows:
+                    break
+
+                blobs = list()
+                for column, values in zip(columns, zip(*rows)):
+                    encode, _ = CODECS.get(column, FLOAT_CODEC)
+                    if encode is encode_floats:
+                        blobs.append(
+                            encode(values, mantissa_bits.get(column))
+                        )
+                    else:
+                        blobs.append(encode(values))
+
+                self._connection.execute(
+                    "INSERT INTO cold_blocks "
+                    f"(start_time, end_time, size, {', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * (len(columns) + 3))})",
+                    (rows[0][0], rows[-1][0], len(rows), *blobs)
+                )
+
+            count = self._connection.execute(
+                "DELETE FROM measurements WHERE timestamp < ?", (before,)
+            ).rowcount
+
+        self._log.info(f"Compacted {count} measurements")
+        return count
+
+    def _iter_cold_rows(self, columns, start, end):
+        """Decodes compressed measurements from given time range.
+
+        **Args**
+            :columns: Columns to read. [tuple]
+            :start: Minimal timestamp, inclusive. [float]
+            :end: Maximal timestamp, exclusive. [float]
+
+        **Yields**
+            Rows of measurements.
+        """
+
+        conditions, params = ["1"], list()
+        if start is not None:
+            conditions.append("end_time >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("start_time < ?")
+            params.append(end)
+        cursor = self._connection.execute(
+            f"SELECT size, timestamp, {', '.join(columns)} FROM cold_blocks "
+            f"WHERE {' AND '.join(conditions)} ORDER BY start_time",
+            params
+        )
+
+        for size, timestamps, *blobs in cursor:
+            timestamps = decode_timestamps(timestamps, size)
+            series = [
+                CODECS.get(column, FLOAT_CODEC)[1](blob, size)
+                for column, blob in zip(columns, blobs)
+            ]
+            for timestamp, row in zip(timestamps, zip(*series)):
+                if (start is None or timestamp >= start) and (
+                    end is None or timestamp < end
+                ):
+                    yield row
+
+    def iter_chunks(
+        self, table="measurements", columns=None, start=None, end=None,
+        chunk_size=10_000
+    ):
+        """Reads table ordered by timestamp in chunks of fixed size, so only
+        one chunk is kept in memory at once. Measurements table is read
+        together with its compressed blocks.
+
+        **Kwargs**
+            :table: Name of table. [str]
+            :columns: Columns to read, all if None. [tuple]
+            :start: Minimal timestamp, inclusive. [float]
+            :end: Maximal timestamp, exclusive. [float]
+            :chunk_size: Number of rows in chunk. [int]
+
+        **Yields**
+            Lists of rows.
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise StorageException(
+                msg="Chunk size is not positive int",
+                desc=f"It is {chunk_size} of type {type(chunk_size)}"
+            )
+
+        table_columns = self.columns(table=table)
+        columns = tuple(table_columns) if columns is None else columns
+        unknown = set(columns) - set(table_columns)
+        if unknown:
+            raise StorageException(
+                msg="Invalid columns",
+                desc=f"Columns {unknown} do not exist in {table}"
+            )
+
+        conditions, params = ["1"], list()
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(end)
+        query = (
+            f"SELECT {', '.join(columns)} FROM {table} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY timestamp"
+        )
+
+        rows = self._connection.execute(query, params)
+        if table == "measurements":
+            rows = chain(
+                self._iter_cold_rows(columns=columns, start=start, end=end),
+                rows
+            )
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        """Closes database connection."""
+
+        self._connection.close()
+        self._log.info("Measurement store closed")
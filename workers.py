@@ -0,0 +1,412 @@
+"""Module containing classes used to run every adapter in its own worker
+process. Parent requests samples of all sensors at once, workers take them in
+parallel and write them to ring buffers in shared memory, from which parent
+reads them straight. Crash or hang of driver's C extension stops only one
+sensor and crashed worker is restarted with capped exponential backoff.
+"""
+
+import time
+import struct
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+
+from adapters import AbstractAdapter
+from resources.errors import WorkerException
+
+HEADER = struct.Struct("<Qd")
+STOP = struct.Struct("<Q")
+REQUEST = struct.Struct("<Qd")
+REQUEST_OFFSET = HEADER.size + STOP.size
+SLOTS_OFFSET = REQUEST_OFFSET + REQUEST.size
+POLL_INTERVAL = .01
+
+
+class RingBuffer:
+    """Ring buffer of samples in shared memory. Header holds number of
+    written samples and time of worker's last heartbeat, it is followed by
+    stop flag and sampling request set by parent and slots holding timestamp
+    and values of one sample each. No locks are used, so killed worker cannot
+    leave buffer locked.
+
+    **Attributes**
+        :capacity: Number of slots. [int]
+    """
+
+    def __init__(self, width, capacity=1024):
+        """Constructor for 'RingBuffer' class.
+
+        **Args**
+            :width: Number of values in sample. [int]
+        **Kwargs**
+            :capacity: Number of slots. [int]
+        """
+
+        if not isinstance(capacity, int) or capacity < 1:
+            raise WorkerException(
+                msg="Capacity is not positive int",
+                desc=f"It is {capacity} of type {type(capacity)}"
+            )
+
+        self.capacity = capacity
+        self._slot = struct.Struct(f"<d{width}d")
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=SLOTS_OFFSET + capacity * self._slot.size
+        )
+        self._buffer = self._memory.buf
+        HEADER.pack_into(self._buffer, 0, 0, time.monotonic())
+        STOP.pack_into(self._buffer, HEADER.size, 0)
+        REQUEST.pack_into(self._buffer, REQUEST_OFFSET, 0, 0.)
+
+    @property
+    def count(self):
+        """Getter for number of written samples.
+
+        **Returns**
+            Number of samples written since creation.
+        """
+
+        return HEADER.unpack_from(self._buffer, 0)[0]
+
+    @property
+    def heartbeat(self):
+        """Getter for worker's heartbeat.
+
+        **Returns**
+            Monotonic time of worker's last heartbeat.
+        """
+
+        return HEADER.unpack_from(self._buffer, 0)[1]
+
+    @property
+    def stopped(self):
+        """Getter for stop flag.
+
+        **Returns**
+            True if worker should stop.
+        """
+
+        return bool(STOP.unpack_from(self._buffer, HEADER.size)[0])
+
+    @stopped.setter
+    def stopped(self, value):
+        """Stop flag setter."""
+
+        STOP.pack_into(self._buffer, HEADER.size, int(value))
+
+    @property
+    def request(self):
+        """Getter for sampling request.
+
+        **Returns**
+            Tuple of number of samples which should be written since
+            creation and delay between them.
+        """
+
+        return REQUEST.unpack_from(self._buffer, REQUEST_OFFSET)
+
+    def ask(self, repetitions, delay):
+        """Requests next samples from worker.
+
+        **Args**
+            :repetitions: Number of requested samples. [int]
+            :delay: Delay between samples. [float]
+
+        **Returns**
+            Number of samples written since creation once request is done.
+        """
+
+        requested = self.count + repetitions
+        REQUEST.pack_into(self._buffer, REQUEST_OFFSET, requested, delay)
+        return requested
+
+    def beat(self):
+        """Updates heartbeat without writing sample."""
+
+        HEADER.pack_into(self._buffer, 0, self.count, time.monotonic())
+
+    def write(self, timestamp, values):
+        """Writes sample to the next slot. Slot is filled before count is
+        updated, so reader never sees partially written sample.
+
+        **Args**
+            :timestamp: Unix time of sample. [float]
+            :values: Values of sample. [tuple]
+        """
+
+        count = self.count
+        self._slot.pack_into(
+            self._buffer,
+            SLOTS_OFFSET + (count % self.capacity) * self._slot.size,
+            timestamp,
+            *values
+        )
+        HEADER.pack_into(self._buffer, 0, count + 1, time.monotonic())
+
+    def read(self, index):
+        """Reads samples written since index. If reader stayed behind by
+        capacity or more samples, the oldest samples are lost.
+
+        **Args**
+            :index: Number of samples already read. [int]
+
+        **Returns**
+            Tuple of new index and list of samples.
+        """
+
+        count = self.count
+        start = max(index, count - self.capacity)
+        samples = [
+            self._slot.unpack_from(
+                self._buffer,
+                SLOTS_OFFSET + (position % self.capacity) * self._slot.size
+            )
+            for position in range(start, count)
+        ]
+
+        # Slot of position 'count - capacity' may be overwritten right now.
+        overwritten = self.count - self.capacity + 1 - start
+        if overwritten > 0:
+            samples = samples[overwritten:]
+
+        return count, samples
+
+    def close(self):
+        """Releases and removes shared memory."""
+
+        self._buffer.release()
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _work(adapter_class, ring, status, args, kwargs):
+    """Worker process loop. Initializes adapter, reports result of
+    initialization and takes requested samples until stopped.
+
+    **Args**
+        :adapter_class: Class of isolated adapter. [type]
+        :ring: Ring buffer to write to. [workers.RingBuffer]
+        :status: Connection receiving None after successful initialization
+        or description of error. [multiprocessing.connection.Connection]
+        :args: Arguments of adapter initialization. [tuple]
+        :kwargs: Keyword arguments of adapter initialization. [dict]
+    """
+
+    try:
+        adapter = adapter_class()
+        adapter.initialize(*args, **kwargs)
+    except Exception as exception:
+        status.send(f"{type(exception).__name__}: {exception}")
+        return
+
+    status.send(None)
+    status.close()
+    next_sample = 0.
+    while not ring.stopped:
+        requested, delay = ring.request
+        now = time.monotonic()
+        if ring.count < requested and now >= next_sample:
+            ring.write(timestamp=time.time(), values=adapter.sample())
+            next_sample = now + delay
+        else:
+            ring.beat()
+            time.sleep(POLL_INTERVAL)
+
+
+class IsolatedAdapter(AbstractAdapter):
+    """Adapter reading samples of other adapter running in worker process.
+    Anomaly detection and averaging are done in parent process.
+
+    To use it properly::
+
+        adapter.request(repetitions=10, delay=.3)
+        adapter.read_data()
+        adapter.get_data(reading=reading)
+
+    **Attributes**
+        :adapter_class: Class of isolated adapter. [type]
+        :timeout: Seconds without heartbeat after which worker is
+        considered hung. [float]
+        :backoff: Delay before the second restart in a row, doubled with
+        every next one. [float]
+        :max_backoff: Maximal delay between restarts. [float]
+        :restarts: Number of worker restarts. [int]
+    """
+
+    def __init__(
+        self, adapter_class, capacity=1024, timeout=10, backoff=1,
+        max_backoff=600
+    ):
+        """Constructor for 'IsolatedAdapter' class.
+
+        **Args**
+            :adapter_class: Class of isolated adapter. [type]
+        **Kwargs**
+            :capacity: Number of samples kept in ring buffer. [int]
+            :timeout: Seconds without heartbeat after which worker is
+            considered hung. [float]
+            :backoff: Delay before the second restart in a row, doubled
+            with every next one. [float]
+            :max_backoff: Maximal delay between restarts. [float]
+        """
+
+        self.NAME = adapter_class.NAME
+        self.METRICS = adapter_class.METRICS
+        self._log = logging.getLogger(f"{self.NAME}_isolated_adapter")
+        self._log.info(f"Initializing IsolatedAdapter of {self.NAME}...")
+
+        super().__init__()
+        self.adapter_class = adapter_class
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self._context = multiprocessing.get_context("fork")
+        self._ring = RingBuffer(width=len(self.METRICS), capacity=capacity)
+        self._index = 0
+        self._requested = None
+        self._failures = 0
+        self._retry_at = None
+        self._process = None
+        self._init_args = ((), {})
+
+        self._log.info("IsolatedAdapter initialized...")
+
+    def initialize(self, *args, **kwargs):
+        self._init_args = (args, kwargs)
+        self._start()
+
+    def request(self, repetitions, delay):
+        """Requests samples from worker without waiting for them, so all
+        workers can sample in parallel.
+
+        **Args**
+            :repetitions: Number of requested samples. [int]
+            :delay: Delay between samples. [float]
+        """
+
+        if repetitions > self._ring.capacity:
+            raise WorkerException(
+                msg="Too many repetitions",
+                desc=f"Ring buffer holds only {self._ring.capacity} samples"
+            )
+
+        self._requested = None
+        if self._check_worker():
+            self._index = self._ring.count
+            self._requested = self._ring.ask(
+                repetitions=repetitions, delay=delay
+            )
+
+    def sample(self):
+        raise WorkerException(
+            msg="Isolated adapter cannot be sampled",
+            desc="Samples are taken with 'request' and read with 'read_data'"
+        )
+
+    def read_data(self, *args, **kwargs):
+        self._wait()
+        self._index, samples = self._ring.read(index=self._index)
+        for sample in samples:
+            for metric, value in zip(self.METRICS, sample[1:]):
+                self.store(metric=metric, value=value)
+
+    def close(self):
+        self._terminate()
+        self._ring.close()
+        self._log.info("Worker closed")
+
+    def _wait(self):
+        if self._requested is None:
+            return
+
+        while self._ring.count < self._requested:
+            if not self._check_worker():
+                return
+            time.sleep(POLL_INTERVAL)
+
+        self._requested = None
+        self._failures = 0
+
+    def _start(self):
+        receiver, sender = self._context.Pipe(duplex=False)
+        self._process = self._context.Process(
+            target=_work,
+            name=f"{self.NAME}_worker",
+            args=(self.adapter_class, self._ring, sender, *self._init_args),
+            daemon=True
+        )
+        self._ring.stopped = False
+        self._ring.beat()
+        self._process.start()
+        sender.close()
+
+        try:
+            if receiver.poll(self.timeout):
+                error = receiver.recv()
+            else:
+                error = f"No answer in {self.timeout} s"
+        except EOFError:
+            error = "Worker exited during initialization"
+        finally:
+            receiver.close()
+
+        if error is not None:
+            self._terminate()
+            raise WorkerException(
+                msg="Worker initialization failed", desc=error
+            )
+
+        self._log.info(f"Worker started with PID {self._process.pid}")
+
+    def _terminate(self):
+        if self._process is None:
+            return
+
+        self._ring.stopped = True
+        self._process.join(self.timeout)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+    def _fail(self, reason):
+        self._terminate()
+        self._failures += 1
+        delay = 0
+        if self._failures > 1:
+            delay = min(
+                self.backoff * 2 ** min(self._failures - 2, 32),
+                self.max_backoff
+            )
+        self._retry_at = time.monotonic() + delay
+        self._log.warning(f"{reason}, restarting worker in {delay} s")
+
+    def _check_worker(self):
+        if self._process is None:
+            raise WorkerException(
+                msg="Worker is not started",
+                desc=f"Adapter {self.NAME} was not initialized"
+            )
+
+        if self._retry_at is None:
+            if not self._process.is_alive():
+                self._fail(
+                    reason=f"Worker died with code {self._process.exitcode}"
+                )
+            elif time.monotonic() - self._ring.heartbeat > self.timeout:
+                self._fail(reason=f"Worker hung for over {self.timeout} s")
+            else:
+                return True
+
+        if time.monotonic() < self._retry_at:
+            return False
+
+        self._retry_at = None
+        self.restarts += 1
+        try:
+            self._start()
+        except WorkerException as exception:
+            self._fail(reason=f"Restart failed, {exception.desc}")
+            return False
+
+        return True